@@ -1,4 +1,17 @@
+import math
+
 import numpy as np
+from numba import njit, float64
+
+@njit(error_model="numpy", cache=True)
+def sigmoid_inplace(out, x, A, B, C):
+    '''Computes A/(1+exp(-B*(x-C))) elementwise in a single pass over `x`,
+        writing the result into the pre-allocated 1D buffer `out`. NaN and
+        infinite inputs propagate as they do in NumPy instead of raising.
+    '''
+    for i in range(x.size):
+        out[i] = A / (1.0 + math.exp(-B*(x[i]-C)))
+    return out
 
 class Sigmoid:
     def __init__(self, A=1, B=4, C=0.5):
@@ -6,8 +19,30 @@ class Sigmoid:
         self.B = B
         self.C = C
 
-    def __call__(self, x: np.ndarray):
-        return self.A/(1 + np.exp(-self.B*(x-self.C)))
+    def __call__(self, x: np.ndarray, out: np.ndarray = None):
+        '''Applies the sigmoid to `x`. A C-contiguous buffer with the shape
+            and dtype of `x` may be passed as `out` to avoid allocating a new
+            array on each call.
+        '''
+        if np.isscalar(x):
+            return self.A/(1 + np.exp(-self.B*(x-self.C)))
+        x = np.asarray(x)
+        if not np.issubdtype(x.dtype, np.floating):
+            x = x.astype(np.float64)
+        if out is None:
+            out = np.empty(x.shape, dtype=x.dtype)
+        elif (out.shape != x.shape or out.dtype != x.dtype
+              or not out.flags.c_contiguous):
+            raise ValueError(f"Output buffer must be a C-contiguous array of "
+                             f"shape {x.shape} and dtype {x.dtype}.")
+        sigmoid_inplace(out.reshape(-1), x.reshape(-1),
+                        float(self.A), float(self.B), float(self.C))
+        return out
+
+    def Compile(self):
+        '''Compiles the sigmoid kernel ahead of its first call.'''
+        sigmoid_inplace.compile((float64[::1], float64[::1],
+                                 float64, float64, float64))
 
 class ReLu:
     def __init__(self, m=1, b=0):
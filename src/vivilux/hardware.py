@@ -3,6 +3,7 @@ from .meshes import Mesh
 from .photonics.ph_meshes import MZImesh
 
 import numpy as np
+from numba import njit
 import nidaqmx
 import nidaqmx.system
 from mcculw import ul
@@ -95,11 +96,41 @@ def correlate(a, b):
     magB = np.sqrt(np.sum(np.square(b)))
     return np.dot(a,b)/(magA*magB)
 
+@njit(cache=True, fastmath=True)
 def magnitude(a):
-    return np.sqrt(np.sum(np.square(a)))
+    total = 0.0
+    for x in a.flat:
+        total += x*x
+    return np.sqrt(total)
 
+@njit(cache=True, fastmath=True)
 def L1norm(a):
-    return np.sum(np.abs(a))
+    total = 0.0
+    for x in a.flat:
+        total += abs(x)
+    return total
+
+@njit(cache=True)
+def lammSolve(X, V, deltaFlat):
+    '''Numeric core of a LAMM step. Solves the least squares problem for
+        the combination of directional derivatives (columns of X) that best
+        matches deltaFlat, dropping directions while X.T @ X is singular.
+        Returns the parameter update and the (reduced) X and coefficients.
+    '''
+    a = np.zeros((X.shape[1], 1))
+    for iteration in range(X.shape[1]):
+        xtx = X.T @ X
+        rank = np.linalg.matrix_rank(xtx)
+        if rank == len(xtx): # matrix will have an inverse
+            a = np.linalg.inv(xtx) @ (X.T @ deltaFlat)
+            break
+        else: # direction vectors cary redundant information use one less
+            X = np.ascontiguousarray(X[:,:-1])
+            V = np.ascontiguousarray(V[:,:-1])
+            a = np.zeros((X.shape[1], 1))
+
+    update = (V @ a).reshape(-1,1)
+    return update, X, a
     
 class Agilent8164():
     def __init__(self, port='GPIB0::20::INSTR'):
@@ -178,7 +209,7 @@ class HardMZI(MZImesh):
         # self.numDirections = numDirections
         numParams = int(np.concatenate([param.flatten() for param in self.getParams()]).size)
         self.numDirections = int(np.round(0.8*numParams)) # arbitrary guess for how many directions are needed
-        self.updateMagnitude = updateMagnitude # magnitude of stepVector in matrixGradient
+        self.updateMagnitude = updateMagnitude # magnitude of the step vectors in getGradients
 
 
         self.records = [] # for recording the convergence of deltas
@@ -309,28 +340,46 @@ class HardMZI(MZImesh):
 
         return params
     
+    def boundStepVectors(self, voltages: np.ndarray, stepVectors: np.ndarray):
+        '''Scales a stack of step vectors (indexed along the first axis) to
+            updateMagnitude and clips them so that voltages plus or minus
+            each step stay within [0, upperLimit].
+        '''
+        sumAxes = tuple(range(1, stepVectors.ndim))
+        randMagnitude = np.sqrt(np.sum(np.square(stepVectors), axis=sumAxes,
+                                       keepdims=True))
+        stepVectors = stepVectors/randMagnitude
+        stepVectors = stepVectors*self.updateMagnitude
+        # Push step vectors within the bounds
+        diffToMax = self.upperLimit - voltages
+        stepVectors = np.minimum(stepVectors, diffToMax) # prevent plus going over
+        stepVectors = np.maximum(stepVectors, -diffToMax) # prevent minus going over
+        stepVectors = np.maximum(stepVectors, -voltages) # prevent minus going under
+        stepVectors = np.minimum(stepVectors, voltages) # prevent plus going under
+        return stepVectors
+
     def matrixGradient(self, voltages: np.ndarray, stepVector = None):
         '''Calculates the gradient of the matrix with respect to the phase
             shifters in the MZI mesh. This gradient is with respect to the
             magnitude of an array of detectors that serves as neural input.
 
+            Single-direction wrapper over boundStepVectors and
+            centralDifference, which getGradients calls directly for all of
+            its directions at once.
+
             Returns derivativeMatrix, stepVector
         '''
-        updateMagnitude = self.updateMagnitude
         stepVector = (np.random.rand(*voltages.shape)-0.5) if stepVector is None else stepVector
         # stepVector = np.sign(np.random.rand(*voltages.shape)-0.5) if stepVector is None else stepVector
-        randMagnitude = np.sqrt(np.sum(np.square(stepVector)))
-        stepVector = stepVector/randMagnitude
-        stepVector = stepVector*updateMagnitude
-        # Push step vector within the bounds
-        diffToMax = self.upperLimit - voltages
-        stepVector = np.minimum(stepVector, diffToMax) # prevent plus going over
-        stepVector = np.maximum(stepVector, -diffToMax) # prevent minus going over
-        stepVector = np.maximum(stepVector, -voltages) # prevent minus going under
-        stepVector = np.minimum(stepVector, voltages) # prevent plus going under
-            
-        # print(stepVector)
-        
+        stepVector = self.boundStepVectors(voltages, stepVector[np.newaxis])[0]
+        derivativeMatrix = self.centralDifference(voltages, stepVector)
+        return derivativeMatrix, stepVector/self.updateMagnitude
+
+    def centralDifference(self, voltages: np.ndarray, stepVector: np.ndarray):
+        '''Measures the directional derivative of the matrix along a bounded
+            step vector using a forward and a backward step on the hardware.
+        '''
+        updateMagnitude = self.updateMagnitude
         currMat = self.get()
         derivativeMatrix = np.zeros(currMat.shape)
 
@@ -346,8 +395,7 @@ class HardMZI(MZImesh):
         differenceMatrix = plusMatrix-minusMatrix
         derivativeMatrix = differenceMatrix/updateMagnitude
         
-
-        return derivativeMatrix, stepVector/updateMagnitude
+        return derivativeMatrix
 
 
     def getGradients(self, delta:np.ndarray, voltages: np.ndarray,
@@ -355,18 +403,21 @@ class HardMZI(MZImesh):
         # Make column vectors for deltas and theta
         m, n = delta.shape # presynaptic, postsynaptic array lengths
         deltaFlat = delta.flatten().reshape(-1,1)
-        thetaFlat = voltages.flatten().reshape(-1,1)
 
         X = np.zeros((deltaFlat.shape[0], numDirections))
-        V = np.zeros((thetaFlat.shape[0], numDirections))
-        
-        # Calculate directional derivatives
+
+        # Generate and bound all step vectors at once (one per column of V)
+        stepVectors = np.random.rand(numDirections, *voltages.shape)-0.5
+        stepVectors = self.boundStepVectors(voltages, stepVectors)
+        V = np.ascontiguousarray(
+            (stepVectors/self.updateMagnitude).reshape(numDirections, -1).T)
+
+        # Measure directional derivatives (hardware probes are sequential)
         for i in range(numDirections):
             if verbose:
                 print(f"\tGetting derivative {i}")
-            tempx, tempv= self.matrixGradient(voltages)
-            tempv = np.concatenate([param.flatten() for param in tempv])
-            X[:,i], V[:,i] = tempx[:n, :m].flatten(), tempv.flatten()
+            tempx = self.centralDifference(voltages, stepVectors[i])
+            X[:,i] = tempx[:n, :m].flatten()
 
         return X, V
     
@@ -389,21 +440,10 @@ class HardMZI(MZImesh):
         for step in range(numSteps):
             newPs = self.voltages.copy()
             currMat = self.get()/self.Gscale
-            print(f"Step: {step}, magnitude delta = {magnitude(deltaFlat)}")  
+            print(f"Step: {step}, magnitude delta = {self.record[-1]}")  
             X, V = self.getGradients(delta, newPs, numDirections, verbose)
             # minimize least squares difference to deltas
-            for iteration in range(numDirections):
-                    xtx = X.T @ X
-                    rank = np.linalg.matrix_rank(xtx)
-                    if rank == len(xtx): # matrix will have an inverse
-                        a = np.linalg.inv(xtx) @ X.T @ deltaFlat
-                        break
-                    else: # direction vectors cary redundant information use one less
-                        X = X[:,:-1]
-                        V = V[:,:-1]
-                        continue
-
-            update = (V @ a).reshape(-1,1)
+            update, X, a = lammSolve(X, V, deltaFlat)
             scaledUpdate = eta*update
             self.setParams([newPs + scaledUpdate]) # sets the parameters and bounds if necessary
             params.append(newPs + scaledUpdate)
@@ -419,10 +459,11 @@ class HardMZI(MZImesh):
             deltaFlat -= trueDelta.flatten().reshape(-1,1) # substract update
             deltaFlat -= self.resetDelta.flatten().reshape(-1,1) # subtract any delta due to voltage reset
             self.resetDelta = np.zeros((self.size, self.size)) # reset the reset delta
-            self.record.append(magnitude(deltaFlat))
-            if verbose: print(f"Magnitude of delta: {magnitude(deltaFlat)}")
-            if magnitude(deltaFlat) < earlyStop:
-                print(f"Break after {step} steps, magnitude of delta: {magnitude(deltaFlat)}")
+            magDelta = magnitude(deltaFlat)
+            self.record.append(magDelta)
+            if verbose: print(f"Magnitude of delta: {magDelta}")
+            if magDelta < earlyStop:
+                print(f"Break after {step} steps, magnitude of delta: {magDelta}")
                 break
         return self.record, params, matrices
 
@@ -12,6 +12,7 @@ if TYPE_CHECKING:
 from .processes import ActAvg, FFFB
 
 import numpy as np
+from numba import njit, typeof, float64
 
 # import defaults
 from .activations import NoisyXX1
@@ -20,6 +21,29 @@ from .optimizers import Simple
 from .visualize import Monitor
 from .photonics.neurons import Neuron, YunJhuModel
 
+@njit(cache=True)
+def membraneStep(Vm, Ge, Gi, Inet, netGe,
+                 GbarE, GbarL, GbarI, ErevE, ErevL, ErevI, Thr, VmDt):
+    '''Fused single-pass update of the net current (Inet) and membrane
+        potential (Vm), which also computes the excitatory conductance above
+        threshold (netGe = Ge*Gbar["E"] - geThr) used as the input to the
+        activation function. All arrays are updated in place.
+    '''
+    for i in range(Vm.size):
+        vm = Vm[i]
+        Inet[i] = (Ge[i] * GbarE * (ErevE - vm) +
+                   GbarL * (ErevL - vm) +
+                   Gi[i] * GbarI * (ErevI - vm)
+                   )
+        Vm[i] = vm + VmDt * Inet[i]
+
+        # Calculate conductance threshold
+        geThr = (Gi[i] * GbarI * (ErevI - Thr) +
+                 GbarL * (ErevL - Thr)
+                 )
+        geThr /= (Thr - ErevE)
+        netGe[i] = Ge[i] * GbarE - geThr
+
 class Layer:
     '''Base class for a layer that includes input matrices and activation
         function pairings. Each layer retains a seperate state for predict
@@ -65,15 +89,12 @@ class Layer:
         # Initialize layer variables
         self.net = None
 
-        self.GeRaw = np.zeros(length, dtype=self.dtype)
-        self.Ge = np.zeros(length, dtype=self.dtype)
-
-        self.GiRaw = np.zeros(length, dtype=self.dtype)
-        self.GiSyn = np.zeros(length, dtype=self.dtype)
-        self.Gi = np.zeros(length, dtype=self.dtype)
-
-        self.Act = np.zeros(length, dtype=self.dtype)
-        self.Vm = np.zeros(length, dtype=self.dtype)
+        # Neural variables are stored as rows of one contiguous block:
+        # GeRaw, GiRaw, Ge, GiSyn, Gi, Act, Vm, and the Inet and netGe
+        # scratch buffers for the fused membrane update. The raw
+        # conductances are adjacent so they can be reset in one pass.
+        self._state = np.zeros((9, length), dtype=self.dtype)
+        self._bindState()
 
         # Empty initial excitatory and inhibitory meshes
         self.excMeshes: list[Mesh] = []
@@ -93,6 +114,16 @@ class Layer:
 
         ## TODO: DELETE THIS AFTER EQUIVALENCE CHECKING
         self.EXTERNAL = None
+        self._clampedData = None # EXTERNAL data already clamped this trial
+
+    def _bindState(self):
+        '''Binds the neural variables as views onto the rows of the state
+            block. The views must be updated in place (never reassigned) so
+            that they remain backed by the block.
+        '''
+        (self.GeRaw, self.GiRaw, self.Ge, self.GiSyn, self.Gi,
+         self.Act, self.Vm, self.Inet, self.netGe) = self._state
+        self.rawConductances = self._state[:2] # GeRaw and GiRaw
 
     def AttachNet(self, net: Net, layerConfig):
         '''Attaches a reference to the net containing the layer and initializes
@@ -160,7 +191,10 @@ class Layer:
         # self.UpdateConductance() ## Moved to nets StepPhase
 
         if self.EXTERNAL is not None: ## TODO: DELETE THIS AFTER EQUIVALENCE CHECKING
-            self.Clamp(self.EXTERNAL, time, debugData=debugData)
+            # clamped data is constant over the phase, so only clamp once
+            if self.EXTERNAL is not self._clampedData:
+                self.Clamp(self.EXTERNAL, time, debugData=debugData)
+                self._clampedData = self.EXTERNAL
             self.EndStep(time, debugData=debugData)
             return
             
@@ -170,22 +204,14 @@ class Layer:
         Gbar = self.Gbar
         Thr = self.actFn.Thr
         
-        # Update layer potentials
-        Vm = self.Vm
-        self.Inet = (self.Ge * Gbar["E"] * (Erev["E"] - Vm) +
-                Gbar["L"] * (Erev["L"] - Vm) +
-                self.Gi * Gbar["I"] * (Erev["I"] - Vm)
-                )
-        self.Vm[:] += self.DtParams["VmDt"] * self.Inet
-
-        # Calculate conductance threshold
-        geThr = (self.Gi * Gbar["I"] * (Erev["I"] - Thr) +
-                 Gbar["L"] * (Erev["L"] - Thr)
-                )
-        geThr /= (Thr - Erev["E"])
+        # Update layer potentials and conductance above threshold
+        membraneStep(self.Vm, self.Ge, self.Gi, self.Inet, self.netGe,
+                     float(Gbar["E"]), float(Gbar["L"]), float(Gbar["I"]),
+                     float(Erev["E"]), float(Erev["L"]), float(Erev["I"]),
+                     float(Thr), float(self.DtParams["VmDt"]))
 
         # Firing rate above threshold governed by conductance-based rate coding
-        newAct = self.actFn(self.Ge*Gbar["E"] - geThr)
+        newAct = self.actFn(self.netGe)
         
         # Activity below threshold is nearly zero
         mask = np.logical_and(
@@ -224,10 +250,10 @@ class Layer:
             mesh.setGscale()
 
         ## InitGInc
-        self.GeRaw[:] = 0 # reset
-        self.GiRaw[:] = 0 # reset
+        self.rawConductances.fill(0) # reset GeRaw and GiRaw
 
         self.EXTERNAL = None
+        self._clampedData = None
     
     def RunProcesses(self):
         '''A set of additional high-level processes which result in current
@@ -286,8 +312,7 @@ class Layer:
 
         # TODO: Improve readability of this line (end of trial code?)
         ## these lines may need to change when Delta-Sender mechanism is included
-        self.GeRaw[:] = 0
-        self.GiRaw[:] = 0
+        self.rawConductances.fill(0) # GeRaw and GiRaw
 
     def getActivity(self):
         return self.Act
@@ -297,15 +322,9 @@ class Layer:
     
     def resetActivity(self):
         '''Resets all activation traces to zero vectors.'''
-        self.Act[:] = 0
+        self._state.fill(0)
         self.Vm[:] = self.VmInit
 
-        self.GeRaw[:] = 0
-        self.Ge[:] = 0
-        self.GiRaw[:] = 0
-        self.GiSyn[:] = 0
-        self.Gi[:] = 0
-
         self.FFFB.Reset()
         self.ActAvg.Reset()
         
@@ -314,16 +333,11 @@ class Layer:
 
 
     def Clamp(self, data, time: float, monitoring = False, debugData=None):
-        clampData = data.copy()
-
-        # truncate extrema
-        clampData[clampData > self.clampMax] = self.clampMax
-        clampData[clampData < self.clampMin] = self.clampMin
-        #Update activity
-        self.Act = clampData
+        # Update activity, truncating extrema
+        np.clip(data, self.clampMin, self.clampMax, out=self.Act)
         
         # Update other internal variables according to activity
-        self.Vm = self.actFn.Thr + self.Act/self.actFn.Gain
+        self.Vm[:] = self.actFn.Thr + self.Act/self.actFn.Gain
 
     def Learn(self, batchComplete=False, dwtLog = {}):
         if self.isInput or self.freeze: return
@@ -385,15 +399,22 @@ class Layer:
     
     def SetDtype(self, dtype: np.dtype):
         self.dtype = dtype
-        self.GeRaw = self.GeRaw.astype(dtype)
-        self.Ge = self.Ge.astype(dtype)
-
-        self.GiRaw = self.GiRaw.astype(dtype)
-        self.GiSyn = self.GiSyn.astype(dtype)
-        self.Gi = self.Gi.astype(dtype)
+        self._state = self._state.astype(dtype)
+        self._bindState()
+
+    def Compile(self):
+        '''Compiles the Numba kernels used by the layer for the types of its
+            state arrays so that the first timestep does not pay the JIT cost.
+            The activation function is only compiled if it defines a Compile
+            method (e.g. Sigmoid); the default NoisyXX1 is plain NumPy.
+        '''
+        arrayType = typeof(self.Vm)
+        membraneStep.compile((arrayType,)*5 + (float64,)*8)
+        if hasattr(self.actFn, "Compile"):
+            self.actFn.Compile()
 
-        self.Act = self.Act.astype(dtype)
-        self.Vm = self.Act.astype(dtype)
+        for mesh in self.excMeshes + self.inhMeshes:
+            mesh.Compile()
 
     def Freeze(self):
         self.freeze = True
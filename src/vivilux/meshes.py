@@ -44,6 +44,7 @@ class Mesh:
         self.size = size if size > len(inLayer) else len(inLayer)
         self.Off = Off
         self.Gain = Gain
+        self._logOff = np.log(Off) # sigmoid evaluated as exp(Gain*log(...))
         self.dtype = dtype
 
         # Weight Balance Parameters
@@ -67,6 +68,7 @@ class Mesh:
         high = InitMean + InitVar
         self.matrix = np.random.uniform(low, high, size=(size, len(inLayer)))
         self.linMatrix = np.copy(self.matrix) # initialize linear weight
+        self._tmp = None # scratch buffer for SigMatrix and InvSigMatrix
         self.InvSigMatrix() # correct linear weight
 
         # Other initializations
@@ -75,6 +77,12 @@ class Mesh:
         self.OptThreshParams = inLayer.OptThreshParams
         self.lastAct = np.zeros(self.size, dtype=self.dtype)
         self.inAct = np.zeros(self.size, dtype=self.dtype)
+        self._out = None # output buffer for applyTo (allocated on first use)
+        self._padded = None # zero-padded input buffer for getInput
+        self._delta = None # delta-sender scratch buffers for apply
+        self._cond1 = None
+        self._mask1 = None
+        self._mask2 = None
 
         # flag to track when matrix updates (for nontrivial meshes like MZI)
         self.modified = False
@@ -147,7 +155,8 @@ class Mesh:
             parameter structures.
         '''
         currMat = self.matrix
-        newMat = self.sigmoid(self.linMatrix + delta)
+        # bound the linear weights as SigMatrix does before applying it
+        newMat = self.sigmoid(np.clip(self.linMatrix + delta, 0, 1))
         self.updateEnergy += self.device.Reset(currMat)
         self.updateEnergy += self.device.Set(newMat)
 
@@ -157,6 +166,7 @@ class Mesh:
     def set(self, matrix):
         self.modified = True
         self.matrix = matrix
+        self._getCache = None
         self.InvSigMatrix()
 
     def setGscale(self):
@@ -172,42 +182,79 @@ class Mesh:
         sendLayActN = np.maximum(np.round(self.avgActP*len(self.inLayer)), 1, dtype=self.dtype)
         sc = 1/sendLayActN # TODO: implement relative importance
         self.Gscale *= sc
+        self._getCache = None
 
     def get(self):
-        return self.Gscale * self.matrix
+        '''Returns the matrix scaled by Gscale. The result is cached until
+            the matrix or Gscale is changed and is marked read-only, so copy
+            it before modifying.
+        '''
+        if self._getCache is None:
+            self._getCache = self.Gscale * self.matrix
+            self._getCache.setflags(write=False)
+        return self._getCache
     
     def getInput(self):
-        act = self.inLayer.getActivity()
-        pad = self.size - act.size
-        return np.pad(act, pad_width=(0,pad))
+        '''Returns the sending layer activity zero-padded to the mesh size.
+            The result is written into a persistent buffer.
+        '''
+        return self.padInput(self.inLayer.getActivity(), self.size)
+
+    def padInput(self, act, length):
+        if self._padded is None or len(self._padded) != length:
+            self._padded = np.zeros(length, dtype=act.dtype)
+        self._padded[:act.size] = act
+        return self._padded
 
     def apply(self):
         self.DeviceHold()
         data = self.getInput()
+        if self._delta is None or len(self._delta) != len(data):
+            self._delta = np.empty(len(data),
+                                   dtype=np.result_type(data, self.lastAct))
+            self._cond1 = np.empty(len(data), dtype=bool)
+            self._mask1 = np.empty(len(data), dtype=bool)
+            self._mask2 = np.empty(len(data), dtype=bool)
+        delta, cond1 = self._delta, self._cond1
+        mask1, mask2 = self._mask1, self._mask2
+        sendThr = self.OptThreshParams["Send"]
+        deltaThr = self.OptThreshParams["Delta"]
 
         # Implement delta-sender behavior (thresholds changes in conductance)
         ## NOTE: this does not reduce matrix multiplications like it does in Leabra
-        delta = data - self.lastAct
-
-        cond1 = data <= self.OptThreshParams["Send"]
-        cond2 = np.abs(delta) <= self.OptThreshParams["Delta"]
-        mask1 = np.logical_or(cond1, cond2)
-        notMask1 = np.logical_not(mask1)
-        delta[mask1] = 0 # only signal delta above both thresholds
-        self.lastAct[notMask1] = data[notMask1]
-
-        cond3 = self.lastAct > self.OptThreshParams["Send"]
-        mask2 = np.logical_and(cond3, cond1)
-        delta[mask2] = -self.lastAct[mask2]
-        self.lastAct[mask2] = 0
+        np.subtract(data, self.lastAct, out=delta)
+
+        np.less_equal(data, sendThr, out=cond1)
+        # |delta| <= deltaThr
+        np.less_equal(delta, deltaThr, out=mask1)
+        np.greater_equal(delta, -deltaThr, out=mask2)
+        np.logical_and(mask1, mask2, out=mask1)
+        np.logical_or(cond1, mask1, out=mask1)
+        np.copyto(delta, 0, where=mask1) # only signal delta above both thresholds
+        np.logical_not(mask1, out=mask2)
+        np.copyto(self.lastAct, data, where=mask2)
+
+        np.greater(self.lastAct, sendThr, out=mask2)
+        np.logical_and(mask2, cond1, out=mask2)
+        np.negative(self.lastAct, out=delta, where=mask2)
+        np.copyto(self.lastAct, 0, where=mask2)
 
         self.inAct[:] += delta
         
         return self.applyTo(self.inAct[:self.shape[1]])
             
     def applyTo(self, data):
+        '''Applies the mesh to a vector of inputs. The result is written into
+            a persistent output buffer which is overwritten on the next call.
+        '''
         try:
-            return np.array(self.get() @ data[:self.shape[1]]).reshape(-1) # TODO: check for slowdown from this trick to support single-element layer
+            matrix = self.get()
+            data = data[:self.shape[1]]
+            dtype = np.result_type(matrix, data)
+            if (self._out is None or len(self._out) != len(matrix)
+                or self._out.dtype != dtype):
+                self._out = np.empty(len(matrix), dtype=dtype)
+            return np.dot(matrix, data, out=self._out)
         except ValueError as ve:
             print(f"Attempted to apply {data} (shape: {data.shape}) to mesh "
                   f"of dimension: {self.get().shape}")
@@ -242,19 +289,13 @@ class Mesh:
 
     def SoftBound(self, delta):
         if self.softBound:
-            mask1 = delta > 0
             m, n = delta.shape
-            delta[mask1] *= self.wbInc * (1 - self.linMatrix[:m,:n][mask1])
-
-            mask2 = np.logical_not(mask1)
-            delta[mask2] *= self.wbDec * self.linMatrix[:m,:n][mask2]
+            linMatrix = self.linMatrix[:m,:n]
+            delta *= np.where(delta > 0,
+                              self.wbInc * (1 - linMatrix),
+                              self.wbDec * linMatrix)
         else:
-            mask1 = delta > 0
-            m, n = delta.shape
-            delta[mask1] *= self.wbInc
-
-            mask2 = np.logical_not(mask1)
-            delta[mask2] *= self.wbDec
+            delta *= np.where(delta > 0, self.wbInc, self.wbDec)
                     
         return delta
     
@@ -373,37 +414,80 @@ class Mesh:
             purely linearly since the maximum and minimum possible weight is
             bounded by physical constraints.
         '''
-        mask1 = self.linMatrix <= 0
-        self.matrix[mask1] = 0
-
-        mask2 = self.linMatrix >= 1
-        self.matrix[mask2] = 1
-
-        mask3 = np.logical_not(np.logical_or(mask1, mask2))
-        self.matrix[mask3] = self.sigmoid(self.linMatrix[mask3])
+        self._getCache = None
+        tmp = self.getScratch()
+
+        # endpoints 0 and 1 evaluate to exactly 0 and 1 in the formula below
+        np.clip(self.linMatrix, 0, 1, out=self.matrix)
+        with np.errstate(divide="ignore", over="ignore"):
+            # 1 / (1 + exp(Gain*(log(Off) + log((1-x)/x))))
+            np.subtract(1, self.matrix, out=tmp)
+            np.divide(tmp, self.matrix, out=tmp)
+            np.log(tmp, out=tmp)
+            np.add(self._logOff, tmp, out=tmp)
+            np.multiply(self.Gain, tmp, out=tmp)
+            np.exp(tmp, out=tmp)
+        np.add(1, tmp, out=tmp)
+        np.reciprocal(tmp, out=self.matrix)
 
         return self.matrix
 
     def sigmoid(self, data):
-        return 1 / (1 + np.power(self.Off*(1-data)/data, self.Gain))
+        '''Elementwise weight sigmoid. Defined on [0, 1], where the endpoints
+            map exactly to 0 and 1; inputs outside this range give nan.
+        '''
+        with np.errstate(divide="ignore", over="ignore"):
+            logRatio = np.log((1-data)/data)
+            return 1 / (1 + np.exp(self.Gain*(self._logOff + logRatio)))
     
     def InvSigMatrix(self):
         '''This function is only called when the weights are set manually to
             ensure that the linear weights (linMatrix) are accurately tracked.
         '''
-        mask1 = self.matrix <= 0
-        self.matrix[mask1] = 0
-
-        mask2 = self.matrix >= 1
-        self.matrix[mask2] = 1
-
-        mask3 = np.logical_not(np.logical_or(mask1, mask2))
-        self.linMatrix[mask3] = self.invSigmoid(self.matrix[mask3])
+        self._getCache = None
+        tmp = self.getScratch()
+
+        np.clip(self.matrix, 0, 1, out=self.matrix)
+        with np.errstate(divide="ignore", over="ignore"):
+            # 1 / (1 + exp((1/Gain)*(log((1-x)/x) - log(Off))))
+            np.subtract(1, self.matrix, out=tmp)
+            np.divide(tmp, self.matrix, out=tmp)
+            np.log(tmp, out=tmp)
+            np.subtract(tmp, self._logOff, out=tmp)
+            np.multiply(1/self.Gain, tmp, out=tmp)
+            np.exp(tmp, out=tmp)
+        np.add(1, tmp, out=tmp)
+        np.reciprocal(tmp, out=tmp)
+
+        # saturated weights leave their linear weight unchanged
+        interior = np.logical_and(self.matrix > 0, self.matrix < 1)
+        np.copyto(self.linMatrix, tmp, where=interior)
 
         return self.linMatrix
     
+    def getScratch(self):
+        '''Returns a persistent scratch array with the shape and dtype of the
+            weight matrix for computing elementwise updates without temporaries.
+        '''
+        if (self._tmp is None or self._tmp.shape != self.matrix.shape
+            or self._tmp.dtype != self.matrix.dtype):
+            self._tmp = np.empty_like(self.matrix)
+        return self._tmp
+
     def invSigmoid(self, data):
-        return 1 / (1 + np.power((1/self.Off)*(1-data)/data, (1/self.Gain)))
+        '''Elementwise inverse of the weight sigmoid. Defined on [0, 1], where
+            the endpoints map exactly to 0 and 1; inputs outside this range
+            give nan.
+        '''
+        with np.errstate(divide="ignore", over="ignore"):
+            logRatio = np.log((1-data)/data)
+            return 1 / (1 + np.exp((logRatio - self._logOff)/self.Gain))
+
+    def Compile(self):
+        '''Compiles any Numba kernels used by the mesh ahead of their first
+            call. Overwrite for meshes which use compiled kernels.
+        '''
+        pass
 
     def __len__(self):
         return self.size
@@ -430,12 +514,30 @@ class TransposeMesh(Mesh):
         raise Exception("Feedback mesh has no 'set' method.")
 
     def get(self):
-        return self.Gscale * self.mesh.get().T 
+        return self.Gscale * self.mesh.get().T
     
     def getInput(self):
-        act = self.mesh.inLayer.getActivity()
-        pad = self.shape[1] - act.size
-        return np.pad(act, pad_width=(0,pad))
+        return self.padInput(self.mesh.inLayer.getActivity(), self.shape[1])
+
+    def applyTo(self, data):
+        '''Applies the transpose of the feedforward mesh. Vectors are
+            computed as data @ matrix so that the feedforward matrix is read
+            in its contiguous layout without materializing the transpose.
+        '''
+        try:
+            srcMatrix = self.mesh.get()
+            data = data[:self.shape[1]]
+            dtype = np.result_type(srcMatrix, data)
+            if (self._out is None or len(self._out) != srcMatrix.shape[1]
+                or self._out.dtype != dtype):
+                self._out = np.empty(srcMatrix.shape[1], dtype=dtype)
+            np.dot(data, srcMatrix, out=self._out)
+            self._out *= self.Gscale
+            return self._out
+        except ValueError as ve:
+            print(f"Attempted to apply {data} (shape: {data.shape}) to mesh "
+                  f"of dimension: {self.get().shape}")
+            print(ve)
 
     def Update(self,
                debugDwt = None,
@@ -384,7 +384,7 @@ class Net:
             if self.phaseConfig[phaseName]["isOutput"]:
                 for dataName, layer in self.layerDict["outputLayers"].items():
                     # TODO use pre-allocated numpy array to speed up execution
-                    self.outputs[dataName].append(layer.getActivity())
+                    self.outputs[dataName].append(layer.getActivity().copy())
 
             if self.phaseConfig[phaseName]["isLearn"] and Train:
                 for layer in self.layers:
@@ -414,6 +414,10 @@ class Net:
         sampleIndices = np.random.permutation(numSamples) if shuffle else range(numSamples)
         
         # TODO: find a faster way to iterate through datasets
+        ## NOTE: samples cannot simply be distributed over a parallel loop.
+        ## Layer and mesh state (delta-sender inAct/lastAct, FFFB fbi, ActAvg
+        ## traces) carries over from one trial to the next unless reset=True,
+        ## and ActAvg and Gscale are updated between trials while learning.
         for sampleCount, sampleIndex in enumerate(sampleIndices):
             if verbosity > 0:
                 print(f"\rEpoch: {self.epochIndex}, "
@@ -504,6 +508,17 @@ class Net:
         if verbosity > 0: print(f"Inference complete.")
         return self.outputs
 
+    def Compile(self):
+        '''Compiles the Numba kernels used by each layer and mesh for the
+            array types of this net. Calling this before Learn or Infer
+            moves the JIT cost out of the first trial.
+
+            This only warms the JIT (and its on-disk cache) for the existing
+            kernels; no code is generated or specialized for the net itself.
+        '''
+        for layer in self.layers:
+            layer.Compile()
+
     def getWeights(self, ffOnly = True):
         weights = []
         for layer in self.layers:
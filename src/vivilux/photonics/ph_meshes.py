@@ -43,6 +43,8 @@ class MZImesh(Mesh):
         super().__init__(size,inLayer,AbsScale,RelScale,InitMean,InitVar,Off,
                          Gain,dtype,wbOn,wbAvgThr,wbHiThr,wbHiGain,wbLoThr,
                          wbLoGain,wbInc,wbDec,WtBalInterval,softBound, **kwargs)
+        # complex precision of the simulated MZIs follows the mesh dtype
+        self.complexDtype = np.result_type(self.dtype, np.complex64)
 
         # pad initial matrix to square matrix
         if size > len(self.inLayer): # expand variables appropriately
@@ -114,9 +116,12 @@ class MZImesh(Mesh):
             parameter structures.
         '''
         params = self.getParams() if params is None else params
-        complexMat = psToRect(params[0], self.size)
+        complexMat = psToRect(params[0], self.size, self.complexDtype)
         return np.square(np.abs(complexMat))
     
+    def Compile(self):
+        CompilePsToRect(self.complexDtype)
+
     def set(self, matrix, verbose=False):
         '''Function used to directly set the matrix implemented by the mesh
             without knowledge of the parameters needed. 
@@ -184,12 +189,10 @@ class MZImesh(Mesh):
             matrix is not interpreteted the same way.
         '''
         # Split data into diagonal matrix where cols represent wavelength
-        # TODO: Check for slowdown because of reshaping in super().applyTo()
+        ## each column is applied in a single matrix-matrix product
         self.DeviceHold()
-        matrixData = Diagonalize(data)
-        shape = matrixData.shape
-        result = super().applyTo(matrixData)
-        result = result.reshape(shape)
+        matrixData = Diagonalize(data[:self.shape[1]])
+        result = self.get() @ matrixData
         ## Take the sum across each wavelength
         return np.sum(result, axis=1)
     
@@ -383,7 +386,7 @@ class DiagMZI(MZImesh):
         '''Function generates matrix from the list of params.
         '''
         params = self.getParams() if params is None else params
-        complexMat = psToRect(params[0], self.size)
+        complexMat = psToRect(params[0], self.size, self.complexDtype)
         soaStage = Diagonalize(params[1])
         return soaStage @ np.square(np.abs(complexMat))
     
@@ -461,9 +464,9 @@ class SVDMZI(MZImesh):
         '''Function generates matrix from the list of params.
         '''
         params = self.getParams() if params is None else params
-        complexMat1 = psToRect(params[0], self.size)
+        complexMat1 = psToRect(params[0], self.size, self.complexDtype)
         soaStage = Diagonalize(params[1])
-        complexMat2 = psToRect(params[2], self.size)
+        complexMat2 = psToRect(params[2], self.size, self.complexDtype)
         fullComplexMat = complexMat2 @ np.sqrt(soaStage) @ complexMat1
 
         return np.square(np.abs(fullComplexMat))
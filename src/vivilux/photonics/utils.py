@@ -1,4 +1,5 @@
 import numpy as np
+from numba import njit, typeof, float64
 
 def Detect(input: np.ndarray) -> np.ndarray:
     '''DC power detected (no cross terms)
@@ -9,16 +10,13 @@ def Diagonalize(vector: np.ndarray) -> np.ndarray:
     '''Turns a vector into a diagonal matrix to simulate independent wavelength
        components that don't have constructive/destructive interference.
     '''
-    diag = np.eye(len(vector))
-    for i in range(len(vector)):
-        diag[i,i] = vector[i]
-    return diag
+    return np.diag(vector)
 
 def BoundTheta(thetas: np.ndarray) -> np.ndarray:
-    '''Bounds the size of phase shifts between 1-2pi.
+    '''Bounds the size of phase shifts on the range [0, 2pi). Wraps in place
+        and is correct for any number of periods.
     '''
-    thetas[thetas > (2*np.pi)] -= 2*np.pi
-    thetas[thetas < 0] += 2*np.pi
+    np.mod(thetas, 2*np.pi, out=thetas)
     return thetas
 
 def BoundGain(gain: np.ndarray, lower=0, upper=np.inf) -> np.ndarray:
@@ -29,22 +27,52 @@ def BoundGain(gain: np.ndarray, lower=0, upper=np.inf) -> np.ndarray:
     return gain
 
 
-def psToRect(phaseShifters: np.ndarray, size: float) -> np.ndarray:
-    '''Calculates the implemented matrix of rectangular MZI from its phase 
-        shifts. Assumes ideal components.
+@njit(cache=True)
+def _psToRect(phaseShifters, fullMatrix):
+    '''Compiled kernel for psToRect. Takes a float64 array of (theta, phi)
+        pairs with shape (numUnits, 2) and writes the mesh matrix into the
+        square complex array fullMatrix, whose dtype sets the precision of
+        the stage multiplications.
     '''
-    fullMatrix = np.eye(size, dtype=np.cdouble)
+    size = fullMatrix.shape[0]
+    coeffs = np.empty(4, dtype=fullMatrix.dtype)
+    for row in range(size):
+        for col in range(size):
+            fullMatrix[row, col] = 1 if row == col else 0
+
     index = 0
     for stage in range(size):
-        stageMatrix = np.eye(size, dtype=np.cdouble)
         parity = stage % 2 # even or odd stage
-        for wg in range(parity, size, 2): 
+        for wg in range(parity, size-1, 2): 
             # add MZI weights in pairs
-            if wg >= size-1: break # handle case of last pair
-            theta, phi = phaseShifters[index]
+            theta = phaseShifters[index, 0]
+            phi = phaseShifters[index, 1]
             index += 1
-            stageMatrix[wg:wg+2,wg:wg+2] = np.array([[np.exp(1j*phi)*np.sin(theta),np.cos(theta)],
-                                                     [np.exp(1j*phi)*np.cos(theta),-np.sin(theta)]],
-                                                     dtype=np.cdouble)
-        fullMatrix[:] = stageMatrix @ fullMatrix
-    return fullMatrix
\ No newline at end of file
+            expPhi = np.exp(1j*phi)
+            coeffs[0], coeffs[1] = expPhi*np.sin(theta), np.cos(theta)
+            coeffs[2], coeffs[3] = expPhi*np.cos(theta), -np.sin(theta)
+            a, b, c, d = coeffs[0], coeffs[1], coeffs[2], coeffs[3]
+
+            # apply the MZI to its pair of rows (other waveguides pass through)
+            for col in range(size):
+                upper = fullMatrix[wg, col]
+                lower = fullMatrix[wg+1, col]
+                fullMatrix[wg, col] = a*upper + b*lower
+                fullMatrix[wg+1, col] = c*upper + d*lower
+    return fullMatrix
+
+def psToRect(phaseShifters: np.ndarray, size: float,
+             dtype = np.complex128) -> np.ndarray:
+    '''Calculates the implemented matrix of rectangular MZI from its phase 
+        shifts. Assumes ideal components. Passing dtype=np.complex64 halves
+        the size of the matrix for forward simulation at reduced precision.
+    '''
+    phaseShifters = np.ascontiguousarray(phaseShifters, dtype=np.float64)
+    fullMatrix = np.empty((int(size), int(size)), dtype=dtype)
+    return _psToRect(phaseShifters.reshape(-1, 2), fullMatrix)
+
+def CompilePsToRect(dtype = np.complex128):
+    '''Compiles the psToRect kernel for the argument types passed by
+        psToRect ahead of its first call.
+    '''
+    _psToRect.compile((float64[:, ::1], typeof(np.empty((1,1), dtype=dtype))))
@@ -85,7 +85,7 @@ class FFFB(NeuralProcess):
         self.pool.Gi_FFFB = FFFBparams["Gi"] * (ffi + self.fbi)
 
     def UpdateAct(self):
-        self.poolAct = self.pool.getActivity()
+        self.poolAct[:] = self.pool.getActivity()
 
     def Reset(self):
         self.fbi = 0
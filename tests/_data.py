@@ -0,0 +1,13 @@
+'''Random datasets shared by the test scripts.
+'''
+import numpy as np
+
+def get_random_unit_io(n=40, d=4, seed=0):
+    '''Returns (inputs, targets), each of n random positive-valued vectors of
+        dimension d with unit L2 norm, drawn from a PCG64 generator.
+    '''
+    rng = np.random.default_rng(seed)
+    io = rng.standard_normal((2, n, d))
+    io /= np.sqrt(np.einsum('...i,...i->...', io, io))[..., np.newaxis]
+    np.abs(io, out=io)
+    return io[0], io[1]
@@ -15,6 +15,8 @@ import pandas as pd
 
 from datetime import timedelta
 from time import time
+import pathlib
+from os import path
 
 # np.set_printoptions(precision=3, suppress=True)
 
@@ -64,21 +66,27 @@ magnitude = vivilux.hardware.magnitude
 L1norm = vivilux.hardware.L1norm
 
 
+VERBOSE = False # print matrices and voltages for each iteration
 numDeltas = 5
-
-startMatrices = []
-allDeltas = []
-targetMatrices = []
-finalMatrices = []
-RECORDS = []
-successes = []
-numIter = []
-initMag = []
+numIterations = 50
+numSteps = 30
+size = mesh.size
+
+# results are indexed by iteration
+# status: 0 = failed/skipped, 1 = did not converge, 2 = converged
+startMatrices = np.zeros((numIterations, size, size))
+allDeltas = np.zeros((numIterations, size, size))
+targetMatrices = np.zeros((numIterations, size, size))
+finalMatrices = np.full((numIterations, size, size), np.nan) # NaN if failed
+RECORDS = np.zeros((numIterations, numSteps+1))
+status = np.zeros(numIterations, dtype=np.int8)
+numIter = np.zeros(numIterations, dtype=np.int32)
+initMag = np.zeros(numIterations)
 
 
 print("\n\n","-"*80,"\nSTARTING CONVERGENCE TEST\n\n")
 #%% Conergence test
-for iteration in range(50):
+for iteration in range(numIterations):
     print(f"\tIteration: {iteration}")
     init = 0.25*np.random.rand(6,1)+2
     target = 0.25*np.random.rand(6,1)+2
@@ -96,58 +104,50 @@ for iteration in range(50):
         print(msg)
         print("SKIPPING ITERATION")
         continue
-    startMatrices.append(startMatrices)
-    strMatrix = str(startMatrix).replace('\n','\n\t\t')
-    print(f"\t\tInitial matrix:\n\t\t{strMatrix}")
-    strVoltages = str(mesh.getParams()[0]).replace('\n','\n\t\t')
-    print(f"\t\tInitial voltages: {strVoltages}")
-    strVoltages2 = str(target).replace('\n','\n\t\t')
-    print(f"\t\tTarget voltages: {strVoltages2}")
-    targetMatrices.append(targetMatrix)
+    startMatrices[iteration] = startMatrix
+    if VERBOSE:
+        strMatrix = str(startMatrix).replace('\n','\n\t\t')
+        print(f"\t\tInitial matrix:\n\t\t{strMatrix}")
+        strVoltages = str(mesh.getParams()[0]).replace('\n','\n\t\t')
+        print(f"\t\tInitial voltages: {strVoltages}")
+        strVoltages2 = str(target).replace('\n','\n\t\t')
+        print(f"\t\tTarget voltages: {strVoltages2}")
+    targetMatrices[iteration] = targetMatrix
     
     #Generate Delta
     delta = targetMatrix - startMatrix
-    allDeltas.append(delta)
-    print("\t\tTarget matrix:\n\t\t", str(targetMatrix).replace('\n','\n\t\t'))
+    allDeltas[iteration] = delta
+    if VERBOSE:
+        print("\t\tTarget matrix:\n\t\t", str(targetMatrix).replace('\n','\n\t\t'))
     # delta = targetMatrix - startMatrix
     magDelta  = magnitude(delta)
-    initMag.append(magDelta)
+    initMag[iteration] = magDelta
     # strMag = str(magnitude(delta))#.replace('\n','\n\t\t')
-    print(f"\t\tStarting with Delta magnitude: {magDelta}...")
+    if VERBOSE: print(f"\t\tStarting with Delta magnitude: {magDelta}...")
     # startingDeltas.append(delta)
     
     start = time()
     try:
         record, params, matrices = mesh.ApplyDelta(delta, eta=1,
                                                      numDirections=3, 
-                                                     numSteps=30,
+                                                     numSteps=numSteps,
                                                       earlyStop=8e-2
                                                      )
-        finalMatrices.append(matrices[-1])
-        strVoltages3 = str(mesh.getParams()[0]).replace('\n','\n\t\t')
-        print(f"\t\tFinal voltages: {strVoltages3}")
+        end = time()
+        finalMatrices[iteration] = matrices[-1]
+        if VERBOSE:
+            strVoltages3 = str(mesh.getParams()[0]).replace('\n','\n\t\t')
+            print(f"\t\tFinal voltages: {strVoltages3}")
     except AssertionError as msg:
         print(msg)
-        # record = -np.ones((4,4))
-        # results = pd.concat([results, {"initMag": magDelta,
-        #                            "iteration": iteration,
-        #                            "numIter": -1,
-        #                            "finalMag": -1,
-        #                            "success": False,
-        #                            "record": record}])
-        finalMatrices.append(False)
-        successes.append(False)
-        RECORDS.append(-np.ones(31))
+        RECORDS[iteration] = -1
         continue
-    end = time()
     print("\tExecution took: ", timedelta(seconds=(end-start)))
     iterToConverge = len(record)
-    numIter.append(iterToConverge)
-    print(f"\tTook {iterToConverge} iterations to converge.")
-    finalMag = record[-1]
-    record = np.pad(record, (0, 31-len(record)))
-    RECORDS.append(record)
-    successes.append(True)
+    numIter[iteration] = iterToConverge
+    if VERBOSE: print(f"\tTook {iterToConverge} iterations to converge.")
+    RECORDS[iteration, :iterToConverge] = record # remainder stays zero
+    status[iteration] = 2 if iterToConverge < numSteps+1 else 1
 
     
     
@@ -155,12 +155,23 @@ vivilux.hardware.DAC_Init()
 inGen.agilent.lasers_on([0,0,0,0])
 print("\n\nSUCCESSFULLY FINISHED. PLEASE MAKE SURE LASER AND TEMPERATURE CONTROL ARE OFF.")
 
+# save the per-iteration results, one column per recorded step
+directory = pathlib.Path(__file__).parent.resolve()
+results = pd.DataFrame({"initMag": initMag,
+                        "numIter": numIter,
+                        "status": status,
+                        })
+results = results.join(pd.DataFrame(RECORDS).add_prefix("record"))
+results.to_csv(path.join(directory, "hardwareConvergence_results.csv"), index=False)
+
 ##%% Plot Convergence versus magnitude
-converged = np.array(numIter) < 31
-x = np.array(initMag)[successes][converged]
-y = np.array(numIter)[converged]
-#find line of best fit
-a, b = np.polyfit(x, y, 1)
+converged = results[results["status"] == 2]
+x = converged["initMag"].to_numpy()
+y = converged["numIter"].to_numpy()
+#find line of best fit (closed-form least squares)
+xMean, yMean = np.mean(x), np.mean(y)
+a = np.sum((x-xMean)*(y-yMean))/np.sum(np.square(x-xMean))
+b = yMean - a*xMean
 plt.figure()
 plt.scatter(x, y)
 fitX = np.linspace(0, 1.2*np.max(x), 20)
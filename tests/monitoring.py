@@ -11,19 +11,14 @@ np.random.seed(seed=0)
 import pandas as pd
 import seaborn as sns
 
+from _data import get_random_unit_io
+
 numSamples = 10
 numEpochs = 50
 
 
-
 #define input and output data (must be normalized and positive-valued)
-vecs = np.random.normal(size=(numSamples, 4))
-mags = np.linalg.norm(vecs, axis=-1)
-inputs = np.abs(vecs/mags[...,np.newaxis])
-vecs = np.random.normal(size=(numSamples, 4))
-mags = np.linalg.norm(vecs, axis=-1)
-targets = np.abs(vecs/mags[...,np.newaxis])
-del vecs, mags
+inputs, targets = get_random_unit_io(numSamples, 4)
 
 
 optArgs = {"lr" : 0.05,
@@ -55,5 +50,4 @@ plt.title("Random Input/Output Matching with MZI meshes")
 plt.ylabel("RMSE")
 plt.xlabel("Epoch")
 plt.legend()
-plt.show()
 plt.show()
\ No newline at end of file
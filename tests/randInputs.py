@@ -6,8 +6,8 @@ from vivilux.metrics import RMSE, ThrMSE, ThrSSE
 
 import numpy as np
 import matplotlib.pyplot as plt
-# import tensorflow as tf
 np.random.seed(seed=0)
+rng = np.random.default_rng(seed=0) # PCG64 generator for the reference and baseline
 # np.seterr(all='raise')
 
 from copy import deepcopy
@@ -65,6 +65,8 @@ fbMeshConfig = {"meshType": Mesh,
 fbMeshes = leabraNet.AddConnections(layerList[1:], layerList[:-1],
                                     meshConfig=fbMeshConfig)
 
+# warm up the JIT kernels so the first trial does not include compilation
+leabraNet.Compile()
 
 result = leabraNet.Learn(input=inputs, target=targets,
                          numEpochs=numEpochs,
@@ -72,28 +74,47 @@ result = leabraNet.Learn(input=inputs, target=targets,
                          shuffle=False,
                          EvaluateFirst=False,
                          )
-time = np.linspace(0,leabraNet.time, len(result['AvgSSE']))
-plt.plot(time, result['AvgSSE'], label="Leabra Net")
-
-
-
-# sig = lambda x: tf.math.sigmoid(10*(x-0.5))
-# refModel = tf.keras.models.Sequential([
-#     tf.keras.layers.InputLayer(input_shape=(4,)),
-#     tf.keras.layers.Dense(4, use_bias=False, activation=sig),
-#     tf.keras.layers.Dense(4, use_bias=False, activation=sig),
-# ])
-# refModel.compile(optimizer=tf.keras.optimizers.SGD(0.001084),
-#                  loss = "mae",
-#                  metrics = "mse"
-# )
-
-# refResult = np.sqrt(refModel.fit(inputs, targets, epochs=numEpochs, batch_size=1).history["mse"])
-# plt.plot(refResult, label="SGD")
-
-
-
-baseline = np.mean([ThrMSE(entry/np.sqrt(np.sum(np.square(entry))), targets) for entry in np.random.uniform(size=(2000,numSamples,inputSize))])
+# both curves are plotted per epoch so they share the x-axis
+plt.plot(result['AvgSSE'], label="Leabra Net")
+
+
+
+# Reference MLP (two bias-free sigmoid layers) trained with per-sample SGD
+# on the MAE loss, reporting the RMS of the per-sample MSE for each epoch
+def sig(x):
+    return 1/(1 + np.exp(-10*(x-0.5)))
+
+def glorot(fanIn, fanOut):
+    limit = np.sqrt(6/(fanIn + fanOut))
+    return rng.uniform(-limit, limit, size=(fanIn, fanOut))
+
+refLR = 0.001084
+W1 = glorot(inputSize, hiddenSize)
+W2 = glorot(hiddenSize, outputSize)
+refResult = []
+for epoch in range(numEpochs):
+    mse = 0
+    for x, y in zip(inputs, targets):
+        h = sig(x @ W1)
+        pred = sig(h @ W2)
+        mse += np.mean(np.square(pred - y))
+        # backpropagate the MAE loss through both sigmoid layers
+        dz2 = np.sign(pred - y)/outputSize * 10*pred*(1-pred)
+        dz1 = (W2 @ dz2) * 10*h*(1-h)
+        W2 -= refLR * np.outer(h, dz2)
+        W1 -= refLR * np.outer(x, dz1)
+    refResult.append(np.sqrt(mse/numSamples))
+plt.plot(refResult, label="SGD")
+
+
+
+# ThrMSE of normalized uniform guesses, averaged over 2000 trials at once
+numTrials = 2000
+guesses = rng.uniform(size=(numTrials,numSamples,inputSize))
+guesses /= np.sqrt(np.einsum('ijk,ijk->i', guesses, guesses))[:,np.newaxis,np.newaxis]
+# every trial has numSamples rows, so the mean over all rows is the trial mean
+baseline = ThrMSE(guesses.reshape(-1, inputSize), np.tile(targets, (numTrials,1)))
+del guesses
 plt.axhline(y=baseline, color="b", linestyle="--", label="baseline guessing")
 
 plt.title("Random Input/Output Matching")
@@ -8,19 +8,15 @@ import numpy as np
 import matplotlib.pyplot as plt
 np.random.seed(seed=0)
 
+from _data import get_random_unit_io
+
 
 numSamples = 40
 numEpochs = 300
 
 
 #define input and output data (must be normalized and positive-valued)
-vecs = np.random.normal(size=(numSamples, 4))
-mags = np.linalg.norm(vecs, axis=-1)
-inputs = np.abs(vecs/mags[...,np.newaxis])
-vecs = np.random.normal(size=(numSamples, 4))
-mags = np.linalg.norm(vecs, axis=-1)
-targets = np.abs(vecs/mags[...,np.newaxis])
-del vecs, mags
+inputs, targets = get_random_unit_io(numSamples, 4)
 
 optArgs = {"lr" : 0.05,
             "beta" : 0.9,